@@ -0,0 +1,87 @@
+# Copyright (c) 2025 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+import wetext
+from wetext import Normalizer
+
+TEXTS = {
+    "en": [
+        "Today is August 8, 2024, and the ticket costs $12.50.",
+        "The meeting starts at 3:30 pm on 2024-08-08.",
+        "She ran 42.195 km in 2 hours and 1 minute.",
+    ],
+    "zh": [
+        "你好 WeTextProcessing 1.0，全新版本儿，简直666，2024年8月8日下午3点。",
+        "一共花了1234.5元，比去年多了25%。",
+        "比分是3:1，第12届运动会在10月1日开幕。",
+    ],
+    "ja": [
+        "2024年8月8日の午後3時に、1000円を払いました。",
+        "人口は約1億2500万人です。",
+        "会議は10時30分から3時間です。",
+    ],
+}
+
+
+def benchmark(normalizer: Normalizer, texts: List[str], threads: int, requests: int) -> Tuple[float, List[str]]:
+    def normalize(i):
+        return normalizer.normalize(texts[i % len(texts)])
+
+    with ThreadPoolExecutor(threads) as executor:
+        # Warm up the threads (and their handles in per-thread mode).
+        list(executor.map(normalize, range(threads)))
+        start = time.perf_counter()
+        outputs = list(executor.map(normalize, range(requests)))
+        return requests / (time.perf_counter() - start), outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the throughput of wetext against the number of threads, checking the outputs."
+    )
+    parser.add_argument("--lang", default="zh", choices=["en", "zh", "ja"])
+    parser.add_argument("--operator", default="tn", choices=["tn", "itn"])
+    parser.add_argument("--text", default=None, help="The text to normalize.")
+    parser.add_argument("--threads", default="1,2,4,8", help="Comma separated numbers of threads.")
+    parser.add_argument("--requests", type=int, default=2000, help="The number of calls per measurement.")
+    parser.add_argument("--per-thread", action="store_true", help="Use per-thread FST handles.")
+    args = parser.parse_args()
+
+    gil_enabled = sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil_enabled else 'disabled'}")
+    wetext.set_per_thread(args.per_thread)
+    normalizer = Normalizer(lang=args.lang, operator=args.operator)
+    texts = [args.text] if args.text else TEXTS[args.lang]
+    # The single-threaded outputs, which the concurrent calls must reproduce.
+    expected = [normalizer.normalize(texts[i % len(texts)]) for i in range(args.requests)]
+
+    print(f"{'threads':>8} {'calls/s':>12} {'speedup':>8}")
+    baseline = None
+    for threads in map(int, args.threads.split(",")):
+        throughput, outputs = benchmark(normalizer, texts, threads, args.requests)
+        mismatches = sum(output != text for output, text in zip(outputs, expected))
+        if mismatches > 0:
+            sys.exit(f"{threads} threads: {mismatches} of {args.requests} outputs differ from the single-threaded ones")
+        baseline = baseline or throughput
+        print(f"{threads:>8} {throughput:>12.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import argparse
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
 import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importlib.metadata import version
 
-from pynini.lib import byte
+from pynini import cdrewrite, concat, cross, difference, string_map, union
+from pynini.lib import byte, utf8
 from pynini.lib.pynutil import add_weight, delete, insert
 
+from wetext.constants import CLASSES, FALLBACK_CLASSES, variant_name
+
 
 def build_zh_processors():
     from tn.chinese.rules.postprocessor import PostProcessor
@@ -57,7 +70,58 @@ def build_zh_processors():
     postprocessor.optimize().star.optimize().write("wetext/fsts/tag_oov.fst")
 
 
-def build_zh_tn():
+def contraction_casings():
+    """
+    Unroll the case handling of `contractions.fix(text, leftovers=True, slang=True)`. Its tables are matched
+    case-insensitively by textsearch, the later tables overriding the earlier ones, and the expansion is cased
+    like the matched text: lower, upper, title or sentence case, or as in the tables for any other casing.
+
+    Returns:
+        The expansion in the tables of each lowercased key, and the expansions of its cased forms.
+    """
+    import contractions
+    from textsearch import case_fn, determine_case
+
+    table = {}
+    for mapping in [contractions.contractions_dict, contractions.leftovers_dict, contractions.slang_dict]:
+        for key, value in mapping.items():
+            table[key.lower()] = value
+    casings = {}
+    for key, value in table.items():
+        forms = [key.upper(), key.title(), key, key[:1].upper() + key[1:]]
+        casings[key] = (value, {form: case_fn.get(determine_case(form), lambda text: text)(value) for form in forms})
+    return casings
+
+
+def build_en_processors():
+    os.makedirs("wetext/fsts", exist_ok=True)
+
+    rewrites = []
+    for key, (value, forms) in contraction_casings().items():
+        rewrites.append(string_map(forms.items()))
+        # The other casings of the key, e.g. "DoN't", are expanded as in the tables.
+        casings = concat(*[union(char.lower(), char.upper()) for char in key])
+        rewrites.append(cross(difference(casings, union(*forms)), value))
+    # Like textsearch, only the ASCII letters, digits and underscore are word characters.
+    boundary = difference(utf8.VALID_UTF8_CHAR, union(byte.ALNUM, "_")).optimize()
+    processor = cdrewrite(
+        union(*rewrites).optimize(),
+        union("[BOS]", boundary),
+        union("[EOS]", boundary),
+        byte.BYTE.star,
+    )
+    processor.optimize().write("wetext/fsts/fix_contractions.fst")
+
+
+def select(lang, operator, fsts, classes=None):
+    """Select the FSTs of the classes, keeping the fallback classes and the FSTs without a tagger (e.g. license_plate)."""
+    if classes is None:
+        return list(fsts.values())
+    classes = set(classes) | set(FALLBACK_CLASSES[lang])
+    return [fst for name, fst in fsts.items() if name in classes or name not in CLASSES[lang][operator]]
+
+
+def build_zh_tn_tagger(classes=None):
     from tn.chinese.rules.cardinal import Cardinal
     from tn.chinese.rules.char import Char
     from tn.chinese.rules.date import Date
@@ -71,36 +135,83 @@ def build_zh_tn():
 
     os.makedirs("wetext/fsts/zh/tn", exist_ok=True)
 
-    date = add_weight(Date().tagger, 1.02)
-    whitelist = add_weight(Whitelist().tagger, 1.03)
-    sport = add_weight(Sport().tagger, 1.04)
-    fraction = add_weight(Fraction().tagger, 1.05)
-    measure = add_weight(Measure().tagger, 1.05)
-    money = add_weight(Money().tagger, 1.05)
-    time = add_weight(Time().tagger, 1.05)
-    cardinal = add_weight(Cardinal().tagger, 1.06)
-    math = add_weight(Math().tagger, 90)
-    char = add_weight(Char().tagger, 100)
-    tagger = date | whitelist | sport | fraction | measure | money | time | cardinal | math | char
-    tagger.optimize().star.optimize().write("wetext/fsts/zh/tn/tagger.fst")
-
-    cardinal = Cardinal().verbalizer
-    char = Char().verbalizer
-    date = Date().verbalizer
-    fraction = Fraction().verbalizer
-    math = Math().verbalizer
-    measure = Measure().verbalizer
-    money = Money().verbalizer
-    sport = Sport().verbalizer
-    time = Time().verbalizer
-    verbalizer = cardinal | char | date | fraction | math | measure | money | sport | time
-    whitelist = Whitelist(remove_erhua=False).verbalizer
-    (verbalizer | whitelist).optimize().star.optimize().write("wetext/fsts/zh/tn/verbalizer.fst")
-    whitelist = Whitelist(remove_erhua=True).verbalizer
-    (verbalizer | whitelist).optimize().star.optimize().write("wetext/fsts/zh/tn/verbalizer_remove_erhua.fst")
-
-
-def build_zh_itn():
+    taggers = {
+        "date": add_weight(Date().tagger, 1.02),
+        "whitelist": add_weight(Whitelist().tagger, 1.03),
+        "sport": add_weight(Sport().tagger, 1.04),
+        "fraction": add_weight(Fraction().tagger, 1.05),
+        "measure": add_weight(Measure().tagger, 1.05),
+        "money": add_weight(Money().tagger, 1.05),
+        "time": add_weight(Time().tagger, 1.05),
+        "cardinal": add_weight(Cardinal().tagger, 1.06),
+        "math": add_weight(Math().tagger, 90),
+        "char": add_weight(Char().tagger, 100),
+    }
+    tagger = union(*select("zh", "tn", taggers, classes))
+    tagger.optimize().star.optimize().write(f"wetext/fsts/{variant_name('zh/tn/tagger', classes)}.fst")
+
+
+def build_zh_tn_verbalizer(remove_erhua=False, classes=None):
+    from tn.chinese.rules.cardinal import Cardinal
+    from tn.chinese.rules.char import Char
+    from tn.chinese.rules.date import Date
+    from tn.chinese.rules.fraction import Fraction
+    from tn.chinese.rules.math import Math
+    from tn.chinese.rules.measure import Measure
+    from tn.chinese.rules.money import Money
+    from tn.chinese.rules.sport import Sport
+    from tn.chinese.rules.time import Time
+    from tn.chinese.rules.whitelist import Whitelist
+
+    os.makedirs("wetext/fsts/zh/tn", exist_ok=True)
+
+    verbalizers = {
+        "cardinal": Cardinal().verbalizer,
+        "char": Char().verbalizer,
+        "date": Date().verbalizer,
+        "fraction": Fraction().verbalizer,
+        "math": Math().verbalizer,
+        "measure": Measure().verbalizer,
+        "money": Money().verbalizer,
+        "sport": Sport().verbalizer,
+        "time": Time().verbalizer,
+        "whitelist": Whitelist(remove_erhua=remove_erhua).verbalizer,
+    }
+    verbalizer = union(*select("zh", "tn", verbalizers, classes))
+    name = "zh/tn/verbalizer_remove_erhua" if remove_erhua else "zh/tn/verbalizer"
+    verbalizer.optimize().star.optimize().write(f"wetext/fsts/{variant_name(name, classes)}.fst")
+
+
+def build_zh_itn_tagger(enable_0_to_9=False, classes=None):
+    from itn.chinese.rules.cardinal import Cardinal
+    from itn.chinese.rules.char import Char
+    from itn.chinese.rules.date import Date
+    from itn.chinese.rules.fraction import Fraction
+    from itn.chinese.rules.math import Math
+    from itn.chinese.rules.measure import Measure
+    from itn.chinese.rules.money import Money
+    from itn.chinese.rules.time import Time
+    from itn.chinese.rules.whitelist import Whitelist
+
+    os.makedirs("wetext/fsts/zh/itn", exist_ok=True)
+
+    taggers = {
+        "date": add_weight(Date().tagger, 1.02),
+        "whitelist": add_weight(Whitelist().tagger, 1.01),
+        "fraction": add_weight(Fraction().tagger, 1.05),
+        "time": add_weight(Time().tagger, 1.05),
+        "math": add_weight(Math().tagger, 1.10),
+        "char": add_weight(Char().tagger, 100),
+        "measure": add_weight(Measure(enable_0_to_9=enable_0_to_9).tagger, 1.05),
+        "money": add_weight(Money(enable_0_to_9=enable_0_to_9).tagger, 1.04),
+        "cardinal": add_weight(Cardinal(True, enable_0_to_9, False).tagger, 1.06),
+    }
+    tagger = union(*select("zh", "itn", taggers, classes))
+    name = "zh/itn/tagger_enable_0_to_9" if enable_0_to_9 else "zh/itn/tagger"
+    tagger.optimize().star.optimize().write(f"wetext/fsts/{variant_name(name, classes)}.fst")
+
+
+def build_zh_itn_verbalizer(classes=None):
     from itn.chinese.rules.cardinal import Cardinal
     from itn.chinese.rules.char import Char
     from itn.chinese.rules.date import Date
@@ -114,36 +225,23 @@ def build_zh_itn():
 
     os.makedirs("wetext/fsts/zh/itn", exist_ok=True)
 
-    for enable_0_to_9 in [True, False]:
-        date = add_weight(Date().tagger, 1.02)
-        whitelist = add_weight(Whitelist().tagger, 1.01)
-        fraction = add_weight(Fraction().tagger, 1.05)
-        time = add_weight(Time().tagger, 1.05)
-        math = add_weight(Math().tagger, 1.10)
-        char = add_weight(Char().tagger, 100)
-        measure = add_weight(Measure(enable_0_to_9=enable_0_to_9).tagger, 1.05)
-        money = add_weight(Money(enable_0_to_9=enable_0_to_9).tagger, 1.04)
-        cardinal = add_weight(Cardinal(True, enable_0_to_9, False).tagger, 1.06)
-        tagger = date | whitelist | fraction | measure | money | time | cardinal | math | char
-        tagger.optimize().star.optimize().write(
-            "wetext/fsts/zh/itn/tagger_enable_0_to_9.fst" if enable_0_to_9 else "wetext/fsts/zh/itn/tagger.fst"
-        )
-
-    cardinal = Cardinal().verbalizer
-    char = Char().verbalizer
-    date = Date().verbalizer
-    fraction = Fraction().verbalizer
-    math = Math().verbalizer
-    measure = Measure().verbalizer
-    money = Money().verbalizer
-    time = Time().verbalizer
-    license_plate = LicensePlate().verbalizer
-    whitelist = Whitelist().verbalizer
-    verbalizer = cardinal | char | date | fraction | math | measure | money | time | license_plate | whitelist
-    verbalizer.optimize().star.optimize().write("wetext/fsts/zh/itn/verbalizer.fst")
-
-
-def build_en_tn():
+    verbalizers = {
+        "cardinal": Cardinal().verbalizer,
+        "char": Char().verbalizer,
+        "date": Date().verbalizer,
+        "fraction": Fraction().verbalizer,
+        "math": Math().verbalizer,
+        "measure": Measure().verbalizer,
+        "money": Money().verbalizer,
+        "time": Time().verbalizer,
+        "license_plate": LicensePlate().verbalizer,
+        "whitelist": Whitelist().verbalizer,
+    }
+    verbalizer = union(*select("zh", "itn", verbalizers, classes))
+    verbalizer.optimize().star.optimize().write(f"wetext/fsts/{variant_name('zh/itn/verbalizer', classes)}.fst")
+
+
+def build_en_tn_tagger(classes=None):
     from tn.english.rules.cardinal import Cardinal
     from tn.english.rules.date import Date
     from tn.english.rules.decimal import Decimal
@@ -161,72 +259,65 @@ def build_en_tn():
 
     os.makedirs("wetext/fsts/en/tn", exist_ok=True)
 
-    cardinal = add_weight(Cardinal().tagger, 1.0)
-    ordinal = add_weight(Ordinal().tagger, 1.0)
-    decimal = add_weight(Decimal().tagger, 1.0)
-    fraction = add_weight(Fraction().tagger, 1.0)
-    date = add_weight(Date().tagger, 0.99)
-    time = add_weight(Time().tagger, 1.00)
-    measure = add_weight(Measure().tagger, 1.00)
-    money = add_weight(Money().tagger, 1.00)
-    telephone = add_weight(Telephone().tagger, 1.00)
-    electronic = add_weight(Electronic().tagger, 1.00)
-    word = add_weight(Word().tagger, 100)
-    whitelist = add_weight(WhiteList().tagger, 1.00)
-    punct = add_weight(Punctuation().tagger, 2.00)
-    rang = add_weight(Range().tagger, 1.01)
-    tagger = (
-        cardinal
-        | ordinal
-        | word
-        | date
-        | decimal
-        | fraction
-        | time
-        | measure
-        | money
-        | telephone
-        | electronic
-        | whitelist
-        | rang
-        | punct
-    ) + delete(byte.SPACE | "\u00a0").star
-    tagger.optimize().star.optimize().write("wetext/fsts/en/tn/tagger.fst")
-
-    cardinal = Cardinal().verbalizer
-    ordinal = Ordinal().verbalizer
-    decimal = Decimal().verbalizer
-    fraction = Fraction().verbalizer
-    word = Word().verbalizer
-    date = Date().verbalizer
-    time = Time().verbalizer
-    measure = Measure().verbalizer
-    money = Money().verbalizer
-    telephone = Telephone().verbalizer
-    electronic = Electronic().verbalizer
-    whitelist = WhiteList().verbalizer
-    punct = Punctuation().verbalizer
-    rang = Range().verbalizer
-    verbalizer = (
-        cardinal
-        | ordinal
-        | word
-        | date
-        | decimal
-        | fraction
-        | time
-        | measure
-        | money
-        | telephone
-        | electronic
-        | whitelist
-        | punct
-        | rang
-    ) + insert(" ")
-    verbalizer.optimize().star.optimize().write("wetext/fsts/en/tn/verbalizer.fst")
-
-
-def build_ja_tn():
+    taggers = {
+        "cardinal": add_weight(Cardinal().tagger, 1.0),
+        "ordinal": add_weight(Ordinal().tagger, 1.0),
+        "decimal": add_weight(Decimal().tagger, 1.0),
+        "fraction": add_weight(Fraction().tagger, 1.0),
+        "date": add_weight(Date().tagger, 0.99),
+        "time": add_weight(Time().tagger, 1.00),
+        "measure": add_weight(Measure().tagger, 1.00),
+        "money": add_weight(Money().tagger, 1.00),
+        "telephone": add_weight(Telephone().tagger, 1.00),
+        "electronic": add_weight(Electronic().tagger, 1.00),
+        "word": add_weight(Word().tagger, 100),
+        "whitelist": add_weight(WhiteList().tagger, 1.00),
+        "punct": add_weight(Punctuation().tagger, 2.00),
+        "range": add_weight(Range().tagger, 1.01),
+    }
+    tagger = union(*select("en", "tn", taggers, classes)) + delete(byte.SPACE | "\u00a0").star
+    tagger.optimize().star.optimize().write(f"wetext/fsts/{variant_name('en/tn/tagger', classes)}.fst")
+
+
+def build_en_tn_verbalizer(classes=None):
+    from tn.english.rules.cardinal import Cardinal
+    from tn.english.rules.date import Date
+    from tn.english.rules.decimal import Decimal
+    from tn.english.rules.electronic import Electronic
+    from tn.english.rules.fraction import Fraction
+    from tn.english.rules.measure import Measure
+    from tn.english.rules.money import Money
+    from tn.english.rules.ordinal import Ordinal
+    from tn.english.rules.punctuation import Punctuation
+    from tn.english.rules.range import Range
+    from tn.english.rules.telephone import Telephone
+    from tn.english.rules.time import Time
+    from tn.english.rules.whitelist import WhiteList
+    from tn.english.rules.word import Word
+
+    os.makedirs("wetext/fsts/en/tn", exist_ok=True)
+
+    verbalizers = {
+        "cardinal": Cardinal().verbalizer,
+        "ordinal": Ordinal().verbalizer,
+        "decimal": Decimal().verbalizer,
+        "fraction": Fraction().verbalizer,
+        "word": Word().verbalizer,
+        "date": Date().verbalizer,
+        "time": Time().verbalizer,
+        "measure": Measure().verbalizer,
+        "money": Money().verbalizer,
+        "telephone": Telephone().verbalizer,
+        "electronic": Electronic().verbalizer,
+        "whitelist": WhiteList().verbalizer,
+        "punct": Punctuation().verbalizer,
+        "range": Range().verbalizer,
+    }
+    verbalizer = union(*select("en", "tn", verbalizers, classes)) + insert(" ")
+    verbalizer.optimize().star.optimize().write(f"wetext/fsts/{variant_name('en/tn/verbalizer', classes)}.fst")
+
+
+def build_ja_tn_tagger(classes=None):
     from tn.japanese.rules.cardinal import Cardinal
     from tn.japanese.rules.char import Char
     from tn.japanese.rules.date import Date
@@ -242,40 +333,93 @@ def build_ja_tn():
 
     os.makedirs("wetext/fsts/ja/tn", exist_ok=True)
 
-    cardinal = add_weight(Cardinal().tagger, 1.06)
-    char = add_weight(Char().tagger, 100)
-    date = add_weight(Date().tagger, 1.02)
-    fraction = add_weight(Fraction().tagger, 1.05)
-    math = add_weight(Math().tagger, 90)
-    measure = add_weight(Measure().tagger, 1.05)
-    money = add_weight(Money().tagger, 1.05)
-    sport = add_weight(Sport().tagger, 1.06)
-    time = add_weight(Time().tagger, 1.05)
-    whitelist = add_weight(Whitelist().tagger, 1.03)
-    tagger = cardinal | char | date | fraction | math | measure | money | sport | time | whitelist
+    taggers = {
+        "cardinal": add_weight(Cardinal().tagger, 1.06),
+        "char": add_weight(Char().tagger, 100),
+        "date": add_weight(Date().tagger, 1.02),
+        "fraction": add_weight(Fraction().tagger, 1.05),
+        "math": add_weight(Math().tagger, 90),
+        "measure": add_weight(Measure().tagger, 1.05),
+        "money": add_weight(Money().tagger, 1.05),
+        "sport": add_weight(Sport().tagger, 1.06),
+        "time": add_weight(Time().tagger, 1.05),
+        "whitelist": add_weight(Whitelist().tagger, 1.03),
+    }
+    tagger = union(*select("ja", "tn", taggers, classes))
     # if self.transliterate:
     #     transliteration = add_weight(Transliteration().tagger, 1.04)
     #     tagger = (tagger | transliteration)
-    tagger.optimize().star.optimize().write("wetext/fsts/ja/tn/tagger.fst")
-
-    cardinal = Cardinal().verbalizer
-    char = Char().verbalizer
-    date = Date().verbalizer
-    fraction = Fraction().verbalizer
-    math = Math().verbalizer
-    measure = Measure().verbalizer
-    money = Money().verbalizer
-    sport = Sport().verbalizer
-    time = Time().verbalizer
-    whitelist = Whitelist().verbalizer
-    verbalizer = cardinal | char | date | fraction | math | measure | money | sport | time | whitelist
+    tagger.optimize().star.optimize().write(f"wetext/fsts/{variant_name('ja/tn/tagger', classes)}.fst")
+
+
+def build_ja_tn_verbalizer(classes=None):
+    from tn.japanese.rules.cardinal import Cardinal
+    from tn.japanese.rules.char import Char
+    from tn.japanese.rules.date import Date
+    from tn.japanese.rules.fraction import Fraction
+    from tn.japanese.rules.math import Math
+    from tn.japanese.rules.measure import Measure
+    from tn.japanese.rules.money import Money
+    from tn.japanese.rules.sport import Sport
+    from tn.japanese.rules.time import Time
+
+    # from tn.japanese.rules.transliteration import Transliteration
+    from tn.japanese.rules.whitelist import Whitelist
+
+    os.makedirs("wetext/fsts/ja/tn", exist_ok=True)
+
+    verbalizers = {
+        "cardinal": Cardinal().verbalizer,
+        "char": Char().verbalizer,
+        "date": Date().verbalizer,
+        "fraction": Fraction().verbalizer,
+        "math": Math().verbalizer,
+        "measure": Measure().verbalizer,
+        "money": Money().verbalizer,
+        "sport": Sport().verbalizer,
+        "time": Time().verbalizer,
+        "whitelist": Whitelist().verbalizer,
+    }
+    verbalizer = union(*select("ja", "tn", verbalizers, classes))
     # if self.transliterate:
     #     transliteration = Transliteration().verbalizer
     #     verbalizer = (verbalizer | transliteration)
-    verbalizer.optimize().star.optimize().write("wetext/fsts/ja/tn/verbalizer.fst")
+    verbalizer.optimize().star.optimize().write(f"wetext/fsts/{variant_name('ja/tn/verbalizer', classes)}.fst")
+
+
+def build_ja_itn_tagger(enable_0_to_9=False, classes=None):
+    from itn.japanese.rules.cardinal import Cardinal
+    from itn.japanese.rules.char import Char
+    from itn.japanese.rules.date import Date
+    from itn.japanese.rules.fraction import Fraction
+    from itn.japanese.rules.math import Math
+    from itn.japanese.rules.measure import Measure
+    from itn.japanese.rules.money import Money
+    from itn.japanese.rules.ordinal import Ordinal
+    from itn.japanese.rules.time import Time
+    from itn.japanese.rules.whitelist import Whitelist
 
+    os.makedirs("wetext/fsts/ja/itn", exist_ok=True)
 
-def build_ja_itn():
+    taggers = {
+        "cardinal": add_weight(Cardinal(True, enable_0_to_9, False).tagger, 1.06),
+        "measure": add_weight(Measure(enable_0_to_9).tagger, 1.05),
+        "money": add_weight(Money(enable_0_to_9).tagger, 1.04),
+        "char": add_weight(Char().tagger, 100),
+        "date": add_weight(Date().tagger, 1.02),
+        "fraction": add_weight(Fraction().tagger, 1.05),
+        "math": add_weight(Math().tagger, 90),
+        "ordinal": add_weight(Ordinal().tagger, 1.04),
+        "time": add_weight(Time().tagger, 1.04),
+        "whitelist": add_weight(Whitelist().tagger, 1.01),
+    }
+
+    tagger = union(*select("ja", "itn", taggers, classes))
+    name = "ja/itn/tagger_enable_0_to_9" if enable_0_to_9 else "ja/itn/tagger"
+    tagger.optimize().star.optimize().write(f"wetext/fsts/{variant_name(name, classes)}.fst")
+
+
+def build_ja_itn_verbalizer(classes=None):
     from itn.japanese.rules.cardinal import Cardinal
     from itn.japanese.rules.char import Char
     from itn.japanese.rules.date import Date
@@ -289,45 +433,387 @@ def build_ja_itn():
 
     os.makedirs("wetext/fsts/ja/itn", exist_ok=True)
 
-    for enable_0_to_9 in [True, False]:
-        cardinal = add_weight(Cardinal(True, enable_0_to_9, False).tagger, 1.06)
-        measure = add_weight(Measure(enable_0_to_9).tagger, 1.05)
-        money = add_weight(Money(enable_0_to_9).tagger, 1.04)
-        char = add_weight(Char().tagger, 100)
-        date = add_weight(Date().tagger, 1.02)
-        fraction = add_weight(Fraction().tagger, 1.05)
-        math = add_weight(Math().tagger, 90)
-        ordinal = add_weight(Ordinal().tagger, 1.04)
-        time = add_weight(Time().tagger, 1.04)
-        whitelist = add_weight(Whitelist().tagger, 1.01)
-
-        tagger = cardinal | char | date | fraction | math | measure | money | ordinal | time | whitelist
-        tagger.optimize().star.optimize().write(
-            "wetext/fsts/ja/itn/tagger_enable_0_to_9.fst" if enable_0_to_9 else "wetext/fsts/ja/itn/tagger.fst"
-        )
-
-    cardinal = Cardinal().verbalizer
-    char = Char().verbalizer
-    date = Date().verbalizer
-    fraction = Fraction().verbalizer
-    math = Math().verbalizer
-    measure = Measure().verbalizer
-    money = Money().verbalizer
-    ordinal = Ordinal().verbalizer
-    time = Time().verbalizer
-    whitelist = Whitelist().verbalizer
-
-    verbalizer = cardinal | char | date | fraction | math | measure | money | ordinal | time | whitelist
-    verbalizer.optimize().star.optimize().write("wetext/fsts/ja/itn/verbalizer.fst")
+    verbalizers = {
+        "cardinal": Cardinal().verbalizer,
+        "char": Char().verbalizer,
+        "date": Date().verbalizer,
+        "fraction": Fraction().verbalizer,
+        "math": Math().verbalizer,
+        "measure": Measure().verbalizer,
+        "money": Money().verbalizer,
+        "ordinal": Ordinal().verbalizer,
+        "time": Time().verbalizer,
+        "whitelist": Whitelist().verbalizer,
+    }
+
+    verbalizer = union(*select("ja", "itn", verbalizers, classes))
+    verbalizer.optimize().star.optimize().write(f"wetext/fsts/{variant_name('ja/itn/verbalizer', classes)}.fst")
+
+
+# name: (build function, keyword arguments, grammar sources, outputs)
+TARGETS = {
+    "zh/processors": (
+        build_zh_processors,
+        {},
+        ["tn/chinese"],
+        ["traditional_to_simple", "remove_interjections", "remove_puncts", "full_to_half", "tag_oov"],
+    ),
+    "en/processors": (build_en_processors, {}, ["contractions", "textsearch"], ["fix_contractions"]),
+    "zh/tn/tagger": (build_zh_tn_tagger, {}, ["tn/chinese"], ["zh/tn/tagger"]),
+    "zh/tn/verbalizer": (build_zh_tn_verbalizer, {}, ["tn/chinese"], ["zh/tn/verbalizer"]),
+    "zh/tn/verbalizer_remove_erhua": (
+        build_zh_tn_verbalizer,
+        {"remove_erhua": True},
+        ["tn/chinese"],
+        ["zh/tn/verbalizer_remove_erhua"],
+    ),
+    "zh/itn/tagger": (build_zh_itn_tagger, {}, ["itn/chinese"], ["zh/itn/tagger"]),
+    "zh/itn/tagger_enable_0_to_9": (
+        build_zh_itn_tagger,
+        {"enable_0_to_9": True},
+        ["itn/chinese"],
+        ["zh/itn/tagger_enable_0_to_9"],
+    ),
+    "zh/itn/verbalizer": (build_zh_itn_verbalizer, {}, ["itn/chinese"], ["zh/itn/verbalizer"]),
+    "en/tn/tagger": (build_en_tn_tagger, {}, ["tn/english"], ["en/tn/tagger"]),
+    "en/tn/verbalizer": (build_en_tn_verbalizer, {}, ["tn/english"], ["en/tn/verbalizer"]),
+    "ja/tn/tagger": (build_ja_tn_tagger, {}, ["tn/japanese"], ["ja/tn/tagger"]),
+    "ja/tn/verbalizer": (build_ja_tn_verbalizer, {}, ["tn/japanese"], ["ja/tn/verbalizer"]),
+    "ja/itn/tagger": (build_ja_itn_tagger, {}, ["itn/japanese"], ["ja/itn/tagger"]),
+    "ja/itn/tagger_enable_0_to_9": (
+        build_ja_itn_tagger,
+        {"enable_0_to_9": True},
+        ["itn/japanese"],
+        ["ja/itn/tagger_enable_0_to_9"],
+    ),
+    "ja/itn/verbalizer": (build_ja_itn_verbalizer, {}, ["itn/japanese"], ["ja/itn/verbalizer"]),
+}
+# name: (lang, operator, enable_0_to_9), built from the FSTs of the language after they are built
+FAST_PATHS = {
+    "zh/tn/fast_path": ("zh", "tn", False),
+    "zh/itn/fast_path": ("zh", "itn", False),
+    "zh/itn/fast_path_enable_0_to_9": ("zh", "itn", True),
+    "ja/tn/fast_path": ("ja", "tn", False),
+    "ja/itn/fast_path": ("ja", "itn", False),
+    "ja/itn/fast_path_enable_0_to_9": ("ja", "itn", True),
+}
+# Texts mixing the pass-through chars (quotes included, which are escaped) with the semiotic classes.
+SAMPLES = {
+    "zh": {
+        "tn": [
+            "你好 WeTextProcessing 1.0，全新版本儿，简直666",
+            '他说"2024年8月8日下午3点"到。',
+            "比分是3:1，花了12.5元，增长了25%",
+        ],
+        "itn": ["二零二四年八月八日下午三点", '他说"一百二十三"个，百分之二十五', "共花了一千二百三十四点五元"],
+    },
+    "ja": {
+        "tn": ["2024年8月8日の午後3時に、1000円を払いました。", '彼は"12.5%"と言った', "会議は10時30分から3時間です"],
+        "itn": ["二千二十四年八月八日の午後三時", '彼は"百二十三"と言った', "千二百三十四円を払いました"],
+    },
+}
+# name: (lang, operator), the checks of the segmented verbalization on the samples, stamped like the targets
+SEGMENTS = {f"{lang}/{operator}/segments": (lang, operator) for lang in SAMPLES for operator in SAMPLES[lang]}
+STAMPS = ".fsts_build.json"
+# The packages of the grammars, whose imports between each other are followed when hashing the sources.
+GRAMMAR_PACKAGES = ["tn", "itn"]
+
+
+def imported_sources(path, package, package_dir):
+    """
+    The grammar sources imported by a module: the grammar directory of an imported module (e.g. "tn/chinese"
+    for tn.chinese.rules.cardinal), or the file of an imported top-level module (e.g. tn/processor.py).
+    """
+    with open(path, encoding="utf-8") as fin:
+        tree = ast.parse(fin.read(), path)
+    modules = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            if node.level > 0:
+                # Resolve the relative import against the package of the module.
+                parts = [package, *os.path.relpath(os.path.dirname(path), package_dir).split(os.sep)]
+                parts = [part for part in parts if part != "."]
+                module = ".".join(parts[: len(parts) - node.level + 1] + ([module] if module else []))
+            modules.extend(f"{module}.{alias.name}" for alias in node.names)
+    sources = set()
+    for module in modules:
+        parts = module.split(".")
+        if parts[0] not in GRAMMAR_PACKAGES:
+            continue
+        root = importlib.util.find_spec(parts[0]).submodule_search_locations[0]
+        # Importing any module of the package runs its __init__.py.
+        if os.path.isfile(os.path.join(root, "__init__.py")):
+            sources.add(os.path.join(root, "__init__.py"))
+        if len(parts) > 1 and os.path.isdir(os.path.join(root, parts[1])):
+            sources.add(f"{parts[0]}/{parts[1]}")
+        elif len(parts) > 1 and os.path.isfile(os.path.join(root, f"{parts[1]}.py")):
+            sources.add(os.path.join(root, f"{parts[1]}.py"))
+    return sources
+
+
+def hash_sources(sources):
+    """
+    Hash the files of the grammar sources, e.g. "tn/chinese", the top-level modules of their packages, and the
+    grammar sources they import, e.g. tn/processor.py for "itn/chinese".
+    """
+    paths = {}
+    pending, seen = list(sources), set()
+    while len(pending) > 0:
+        source = pending.pop()
+        if source in seen:
+            continue
+        seen.add(source)
+        if os.path.isfile(source):
+            # An imported top-level module.
+            package_dir = os.path.dirname(source)
+            package = os.path.basename(package_dir)
+            files = [source]
+        else:
+            package, _, subdir = source.partition("/")
+            package_dir = importlib.util.find_spec(package).submodule_search_locations[0]
+            files = []
+            for dirpath, dirnames, filenames in os.walk(package_dir):
+                # Only walk into the grammar directory, e.g. tn/chinese but not tn/english.
+                dirnames[:] = [
+                    name
+                    for name in dirnames
+                    if os.path.join(dirpath, name).startswith(os.path.join(package_dir, subdir))
+                ]
+                files.extend(os.path.join(dirpath, name) for name in filenames if not name.endswith(".pyc"))
+        for path in files:
+            paths[os.path.join(package, os.path.relpath(path, package_dir))] = path
+            if package in GRAMMAR_PACKAGES and path.endswith(".py"):
+                pending.extend(imported_sources(path, package, package_dir))
+    sha256 = hashlib.sha256()
+    for name in sorted(paths):
+        sha256.update(name.encode())
+        with open(paths[name], "rb") as fin:
+            sha256.update(fin.read())
+    return sha256.hexdigest()
+
+
+def stamp(target):
+    """
+    Hash everything the target depends on: its grammar sources, build function (weights included) and arguments,
+    and for the class-selective variants, the class selection and the classes of the languages.
+    """
+    func, kwargs, sources, _ = target
+    sha256 = hashlib.sha256()
+    sha256.update(hash_sources(sources).encode())
+    sha256.update(inspect.getsource(func).encode())
+    sha256.update(json.dumps(kwargs, sort_keys=True).encode())
+    sha256.update(version("pynini").encode())
+    if "classes" in kwargs:
+        sha256.update(inspect.getsource(select).encode())
+        sha256.update(json.dumps([CLASSES, FALLBACK_CLASSES], sort_keys=True).encode())
+    return sha256.hexdigest()
+
+
+def class_variants(classes):
+    """The class-selective variants of the tagger and verbalizer targets, for the languages having the classes."""
+    variants = {}
+    for name, (func, kwargs, sources, outputs) in TARGETS.items():
+        lang, operator = name.split("/")[:2]
+        if operator not in CLASSES[lang] or not set(classes) <= set(CLASSES[lang][operator]):
+            continue
+        if variant_name(name, classes) == name:
+            continue
+        outputs = [variant_name(output, classes) for output in outputs]
+        variants[variant_name(name, classes)] = (func, {**kwargs, "classes": sorted(classes)}, sources, outputs)
+    return variants
+
+
+def segments_dependencies(lang, operator):
+    dependencies = {f"{lang}/{operator}/tagger", f"{lang}/{operator}/verbalizer"}
+    if lang == "zh" and operator == "tn":
+        dependencies.add("zh/tn/verbalizer_remove_erhua")
+    return dependencies
+
+
+def fast_path_dependencies(lang, operator, enable_0_to_9=False):
+    dependencies = {f"{lang}/tn/tagger", f"{lang}/tn/verbalizer", f"{lang}/tn/segments"}
+    if operator == "itn":
+        dependencies.add(f"{lang}/itn/tagger_enable_0_to_9" if enable_0_to_9 else f"{lang}/itn/tagger")
+        dependencies.add(f"{lang}/itn/verbalizer")
+        dependencies.add(f"{lang}/itn/segments")
+    return dependencies
+
+
+def check_stamp(dependencies, stamps, sources):
+    """Hash what a check or table depends on: the stamps of its dependencies and the sources of its code and data."""
+    sha256 = hashlib.sha256()
+    for dependency in sorted(dependencies):
+        sha256.update(f"{dependency}={stamps.get(dependency)}".encode())
+    for source in sources:
+        sha256.update(source.encode())
+    return sha256.hexdigest()
+
+
+def segments_stamp(name, stamps):
+    from wetext import token_parser, utils
+
+    lang, operator = SEGMENTS[name]
+    sources = [inspect.getsource(check_segments), inspect.getsource(token_parser), inspect.getsource(utils)]
+    sources.append(json.dumps(SAMPLES[lang][operator]))
+    return check_stamp(segments_dependencies(lang, operator), stamps, sources)
+
+
+def fast_path_stamp(name, stamps):
+    from wetext import fast_path
+
+    lang, operator, enable_0_to_9 = FAST_PATHS[name]
+    sources = [inspect.getsource(build_fast_path), inspect.getsource(fast_path)]
+    return check_stamp(fast_path_dependencies(lang, operator, enable_0_to_9), stamps, sources)
+
+
+def save_stamps(stamps):
+    with open(STAMPS, "w") as fout:
+        json.dump(stamps, fout, indent=2, sort_keys=True)
+
+
+def build_fast_path(lang, operator, enable_0_to_9=False):
+    """
+    Tabulate the FST outputs of the numbers below FAST_PATH_RANGE (their spelling from TN for ITN), and check
+    exhaustively that normalizing them with the table gives the same outputs as normalizing them without it.
+    """
+    from wetext import fast_path
+    from wetext.config import NormalizerConfig
+    from wetext.utils import reorder, run_stages, tag, verbalize
+
+    def normalize(text, operator, enable_0_to_9=False):
+        # The tagger, TokenParser and verbalizer without any shortcut.
+        tagged = tag(text, lang, operator, enable_0_to_9)
+        return verbalize(reorder(tagged, lang, operator), lang, operator)
+
+    inputs = [str(number) for number in range(fast_path.FAST_PATH_RANGE)]
+    if operator == "itn":
+        inputs = list(dict.fromkeys(normalize(text, "tn") for text in inputs))
+    outputs = [normalize(text, operator, enable_0_to_9) for text in inputs]
+    name = fast_path.table_name(lang, operator, enable_0_to_9)
+
+    # An empty table disables the fast path, so run_stages goes through the FSTs.
+    fast_path.TABLES[name] = {}
+    config = NormalizerConfig(lang=lang, operator=operator, enable_0_to_9=enable_0_to_9)
+    expected = [run_stages(text, config) for text in inputs]
+
+    with open(f"wetext/fsts/{name}.tsv", "w", encoding="utf-8") as fout:
+        for text, output in zip(inputs, outputs):
+            assert "\t" not in text + output and "\n" not in text + output
+            fout.write(f"{text}\t{output}\n")
+    fast_path.TABLES.pop(name)
+    for text, output in zip(inputs, expected):
+        if fast_path.lookup(text, lang, operator, enable_0_to_9) is None:
+            raise RuntimeError(f"{name}: {text!r} is not covered by the fast path.")
+        if run_stages(text, config) != output:
+            raise RuntimeError(f"{name}: the fast path of {text!r} differs from the FSTs.")
+
+
+def check_segments(lang, operator):
+    """
+    Check that copying the runs of chars and verbalizing the other tokens gives the same outputs as verbalizing
+    all the tokens, for the samples of the language.
+    """
+    from wetext.utils import reorder, reorder_and_verbalize, tag, verbalize
+
+    for remove_erhua in [False, True] if lang == "zh" and operator == "tn" else [False]:
+        for text in SAMPLES[lang][operator]:
+            tagged = tag(text, lang, operator)
+            expected = verbalize(reorder(tagged, lang, operator), lang, operator, remove_erhua)
+            if reorder_and_verbalize(tagged, lang, operator, remove_erhua) != expected:
+                raise RuntimeError(f"{lang}/{operator}: the segmented verbalization of {text!r} differs from the FSTs.")
 
 
 def main():
-    build_zh_processors()
-    build_zh_tn()
-    build_zh_itn()
-    build_en_tn()
-    build_ja_tn()
-    build_ja_itn()
+    parser = argparse.ArgumentParser(description="Build the FSTs of wetext.")
+    parser.add_argument("--only", nargs="+", default=None, help="Build the named targets (or prefixes), e.g. zh/itn.")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="The number of parallel builds.")
+    parser.add_argument("--force", action="store_true", help="Rebuild the targets even if their inputs are unchanged.")
+    parser.add_argument(
+        "--classes", nargs="+", default=None, help="Also build the taggers and verbalizers with only these classes."
+    )
+    args = parser.parse_args()
+
+    targets = TARGETS
+    if args.classes is not None:
+        variants = class_variants(args.classes)
+        if len(variants) == 0:
+            parser.error(f"no tagger has all the classes {args.classes}")
+        targets = {**TARGETS, **variants}
+    names = [
+        name
+        for name in [*targets, *SEGMENTS, *FAST_PATHS]
+        if args.only is None or any(name == only or name.startswith(only.rstrip("/") + "/") for only in args.only)
+    ]
+    if len(names) == 0:
+        parser.error(f"no target matches {args.only}, the targets are: {', '.join(targets)}")
+
+    stamps = {}
+    if os.path.exists(STAMPS):
+        with open(STAMPS) as fin:
+            stamps = json.load(fin)
+    pending = {}
+    for name in filter(targets.__contains__, names):
+        digest = stamp(targets[name])
+        outputs = [f"wetext/fsts/{output}.fst" for output in targets[name][3]]
+        if not args.force and stamps.get(name) == digest and all(map(os.path.exists, outputs)):
+            print(f"{name}: up to date")
+            continue
+        pending[name] = digest
+
+    # The failed targets and checks, the others are still built and stamped so that they are not rebuilt next time.
+    failures = {}
+
+    def fail(name, error):
+        failures[name] = error
+        print(f"{name}: failed", file=sys.stderr)
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+    os.makedirs("wetext/fsts", exist_ok=True)
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {executor.submit(targets[name][0], **targets[name][1]): name for name in pending}
+        for future in as_completed(futures):
+            name = futures[future]
+            if future.exception() is not None:
+                fail(name, future.exception())
+                continue
+            print(f"{name}: built")
+            stamps[name] = pending[name]
+            save_stamps(stamps)
+
+    def run_check(name, dependencies, digest, func, *func_args, output=None):
+        # The checks are selected by name and by their dependencies, e.g. --only zh/tn also rebuilds zh/itn/fast_path.
+        if name not in names and not dependencies & pending.keys():
+            return
+        if dependencies & failures.keys():
+            print(f"{name}: skipped, its dependencies failed", file=sys.stderr)
+            return
+        if not args.force and stamps.get(name) == digest and (output is None or os.path.exists(output)):
+            print(f"{name}: up to date")
+            return
+        try:
+            func(*func_args)
+        except Exception as error:
+            fail(name, error)
+            return
+        print(f"{name}: verified")
+        # The stamp is only written once the check passes, so a failed check runs again next time.
+        pending[name] = stamps[name] = digest
+        save_stamps(stamps)
+
+    for name, (lang, operator) in SEGMENTS.items():
+        dependencies = segments_dependencies(lang, operator)
+        run_check(name, dependencies, segments_stamp(name, stamps), check_segments, lang, operator)
+    for name, (lang, operator, enable_0_to_9) in FAST_PATHS.items():
+        dependencies = fast_path_dependencies(lang, operator, enable_0_to_9)
+        digest = fast_path_stamp(name, stamps)
+        output = f"wetext/fsts/{name}.tsv"
+        run_check(name, dependencies, digest, build_fast_path, lang, operator, enable_0_to_9, output=output)
+
+    if len(failures) > 0:
+        sys.exit(f"failed to build: {', '.join(sorted(failures))}")
 
 
 if __name__ == "__main__":
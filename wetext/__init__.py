@@ -12,8 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from wetext.column import normalize_column
+from wetext.fst import fst_info, set_memory_budget, set_per_thread, unload
 from wetext.utils import (
     normalize,
+    normalize_bytes,
+    normalize_lines,
+    normalize_multi,
     postprocess,
     preprocess,
     reorder,
@@ -23,4 +28,21 @@ from wetext.utils import (
 )
 from wetext.wetext import Normalizer
 
-__all__ = ["Normalizer", "normalize", "postprocess", "preprocess", "reorder", "should_normalize", "tag", "verbalize"]
+__all__ = [
+    "Normalizer",
+    "fst_info",
+    "normalize",
+    "normalize_bytes",
+    "normalize_column",
+    "normalize_lines",
+    "normalize_multi",
+    "postprocess",
+    "preprocess",
+    "reorder",
+    "set_memory_budget",
+    "set_per_thread",
+    "should_normalize",
+    "tag",
+    "unload",
+    "verbalize",
+]
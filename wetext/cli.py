@@ -29,8 +29,10 @@ from wetext import Normalizer
 @click.option("--tag-oov", is_flag=True, help="Tag out-of-vocabulary words.")
 @click.option("--enable-0-to-9", is_flag=True, help="Enable 0-to-9 conversion.")
 @click.option("--remove-erhua", is_flag=True, help="Remove erhua.")
+@click.option("--classes", "-c", multiple=True, help="Semiotic classes to normalize, e.g. -c cardinal -c date.")
 def main(**kwargs):
     text = kwargs.pop("text")
+    kwargs["classes"] = list(kwargs["classes"]) or None
     normalizer = Normalizer(**kwargs)
     text = normalizer.normalize(text)
     print(text)
@@ -0,0 +1,91 @@
+# Copyright (c) 2025 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Optional
+
+from wetext.config import NormalizerConfig
+from wetext.utils import normalize
+
+
+def rebuild_dictionary(chunk, values):
+    """
+    Rebuild a dictionary array with its normalized dictionary values. The values which become equal after
+    normalization are merged, as pandas requires unique categories.
+
+    Args:
+        chunk: The input dictionary array.
+        values: The normalized values of its dictionary.
+    Returns:
+        The dictionary array of the normalized values.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    dictionary = pc.unique(values).drop_null()
+    indices = pc.take(pc.index_in(values, value_set=dictionary, skip_nulls=True), chunk.indices)
+    return pa.DictionaryArray.from_arrays(indices.cast(chunk.indices.type), dictionary, ordered=chunk.type.ordered)
+
+
+def normalize_column(column, config: Optional[NormalizerConfig] = None, num_workers: Optional[int] = None, **kwargs):
+    """
+    Normalize a string column. Each distinct value is normalized once, and the output is built
+    by Arrow from the normalized distinct values without creating Python objects per row. For
+    dictionary arrays (and categorical Series), only the dictionary is normalized and the indices are kept.
+
+    Args:
+        column: A pyarrow string (or dictionary of strings) Array or ChunkedArray, or a pandas Series of strings.
+        config: Optional normalization config object.
+        num_workers: The number of threads normalizing the distinct values in parallel.
+    Returns:
+        The normalized column, of the same kind (and pandas index) as the input. Nulls are kept.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        raise ImportError("normalize_column requires pyarrow, please install it with `pip install wetext[arrow]`.")
+    config = replace(config or NormalizerConfig(), **kwargs)
+
+    series = None
+    if not isinstance(column, (pa.Array, pa.ChunkedArray)):
+        series = column
+        # Categorical series are converted to dictionary arrays, the others to string arrays.
+        categorical = str(series.dtype) == "category"
+        column = pa.array(series, type=None if categorical else pa.string(), from_pandas=True)
+    chunked = column if isinstance(column, pa.ChunkedArray) else pa.chunked_array([column])
+    dictionary = pa.types.is_dictionary(chunked.type)
+    value_chunks = [chunk.dictionary for chunk in chunked.chunks] if dictionary else chunked.chunks
+    value_type = chunked.type.value_type if dictionary else chunked.type
+
+    distinct = pc.unique(pa.chunked_array(value_chunks, type=value_type)).drop_null()
+    texts = distinct.to_pylist()
+    num_workers = num_workers or min(32, (os.cpu_count() or 1) + 4)
+    batch_size = max(1, -(-len(texts) // num_workers))
+    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+    with ThreadPoolExecutor(num_workers) as executor:
+        results = executor.map(lambda batch: [normalize(text, config) for text in batch], batches)
+        normalized = pa.array([text for batch in results for text in batch], type=value_type)
+
+    chunks = [pc.take(normalized, pc.index_in(chunk, value_set=distinct, skip_nulls=True)) for chunk in value_chunks]
+    if dictionary:
+        chunks = [rebuild_dictionary(chunk, values) for chunk, values in zip(chunked.chunks, chunks)]
+    output = pa.chunked_array(chunks, type=chunked.type)
+    if series is not None:
+        return output.to_pandas().set_axis(series.index).rename(series.name)
+    if isinstance(column, pa.Array):
+        return output.combine_chunks()
+    return output
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from dataclasses import dataclass
-from typing import Literal
+from typing import List, Literal, Optional
 
 
 @dataclass
@@ -49,3 +49,6 @@ class NormalizerConfig:
 
     remove_erhua: bool = False
     """Remove 'erhua' suffixes in Chinese (e.g., "哪儿" -> "哪")."""
+
+    classes: Optional[List[str]] = None
+    """Semiotic classes to normalize (e.g., ["cardinal", "date"]), using the smallest prebuilt tagger covering them."""
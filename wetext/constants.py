@@ -12,22 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 from importlib.resources import files
+from typing import Iterable, Optional, Tuple
 
-from kaldifst import TextNormalizer as normalizer
+from wetext.fst import REGISTRY, Fst
 
 
-def load_fst(fst_path) -> normalizer:
+def load_fst(fst_path) -> Fst:
     """
-    Load a FST from the fsts directory.
+    Load a FST from the fsts directory. The FST is read from disk on its first use.
 
     Args:
         fst_path: The path to the FST file.
     Returns:
         The loaded FST.
     """
-    fst_path = files("wetext.fsts").joinpath(fst_path)
-    return normalizer(str(fst_path))
+    return REGISTRY.get(os.path.splitext(fst_path)[0])
 
 
 EOS = "<EOS>"
@@ -49,8 +50,45 @@ ITN_ORDERS = {
     "money": ["currency", "value", "decimal"],
     "time": ["hour", "minute", "second", "noon"],
 }
+# The semiotic classes of the taggers, a tagger can be built with a subset of them.
+CLASSES = {
+    "en": {
+        "tn": [
+            "cardinal",
+            "date",
+            "decimal",
+            "electronic",
+            "fraction",
+            "measure",
+            "money",
+            "ordinal",
+            "punct",
+            "range",
+            "telephone",
+            "time",
+            "whitelist",
+            "word",
+        ],
+    },
+    "zh": {
+        "tn": ["cardinal", "char", "date", "fraction", "math", "measure", "money", "sport", "time", "whitelist"],
+        "itn": ["cardinal", "char", "date", "fraction", "math", "measure", "money", "time", "whitelist"],
+    },
+    "ja": {
+        "tn": ["cardinal", "char", "date", "fraction", "math", "measure", "money", "sport", "time", "whitelist"],
+        "itn": ["cardinal", "char", "date", "fraction", "math", "measure", "money", "ordinal", "time", "whitelist"],
+    },
+}
+# The classes of all the languages for each operator.
+KNOWN_CLASSES = {
+    operator: {name for operators in CLASSES.values() for name in operators.get(operator, [])}
+    for operator in ["tn", "itn"]
+}
+# The classes passing the other text through, which every tagger keeps.
+FALLBACK_CLASSES = {"en": ["punct", "word"], "zh": ["char"], "ja": ["char"]}
 FSTS = {
     "preprocess": {
+        "fix_contractions": load_fst("fix_contractions.fst"),
         "traditional_to_simple": load_fst("traditional_to_simple.fst"),
     },
     "en": {
@@ -89,3 +127,75 @@ FSTS = {
         "tag_oov": load_fst("tag_oov.fst"),
     },
 }
+
+
+def variant_name(name: str, classes: Optional[Iterable[str]] = None) -> str:
+    """
+    Get the name of the FST built with a subset of the classes, e.g. "zh/tn/tagger-cardinal-date".
+
+    Args:
+        name: The name of the full FST, e.g. "zh/tn/tagger".
+        classes: The classes of the FST, None for all the classes.
+    Returns:
+        The name of the FST.
+    """
+    lang, operator, _ = name.split("/")
+    if classes is None or set(CLASSES[lang][operator]) <= set(classes):
+        return name
+    return "-".join([name, *sorted(set(classes) - set(FALLBACK_CLASSES[lang]))])
+
+
+SELECTED_CLASSES = {}
+
+
+def check_classes(operator: str, classes: Iterable[str]):
+    """
+    Check that the classes are known, i.e. that some language has them for the operator.
+
+    Args:
+        operator: The operator to use.
+        classes: The classes to check.
+    """
+    unknown = set(classes) - KNOWN_CLASSES[operator]
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown classes for {operator}: {', '.join(sorted(unknown))}.")
+
+
+def select_classes(
+    lang: str, operator: str, classes: Iterable[str], enable_0_to_9: bool = False, remove_erhua: bool = False
+) -> Optional[Tuple[str, ...]]:
+    """
+    Select the smallest prebuilt tagger covering the classes the language has, whose tagger and verbalizer in use
+    are both built.
+
+    Args:
+        lang: The language of the text.
+        operator: The operator to use.
+        classes: The classes to cover.
+        enable_0_to_9: Whether the 0-to-9 tagger is used for ITN.
+        remove_erhua: Whether the erhua removing verbalizer is used for TN.
+    Returns:
+        The classes of the selected tagger, None for the full tagger.
+    """
+    key = (lang, operator, frozenset(classes), enable_0_to_9, remove_erhua)
+    if key not in SELECTED_CLASSES:
+        check_classes(operator, classes)
+        # The classes of the other languages (e.g. decimal for Chinese) are ignored.
+        classes = set(classes) & set(CLASSES[lang][operator])
+        fsts = files("wetext.fsts")
+        tagger = "tagger_enable_0_to_9" if enable_0_to_9 else "tagger"
+        verbalizer = "verbalizer_remove_erhua" if remove_erhua else "verbalizer"
+        names = [f"{lang}/{operator}/{tagger}", f"{lang}/{operator}/{verbalizer}"]
+        selected, size = None, os.path.getsize(load_fst(names[0]).path)
+        for path in fsts.joinpath(lang).joinpath(operator).iterdir():
+            stem, extension = os.path.splitext(path.name)
+            if not stem.startswith(f"{tagger}-") or extension != ".fst":
+                continue
+            variant = (*stem.split("-")[1:], *FALLBACK_CLASSES[lang])
+            if not set(classes) <= set(variant) or os.path.getsize(str(path)) >= size:
+                continue
+            # The class-selective tagger is only usable with its verbalizer.
+            if all(fsts.joinpath(f"{variant_name(name, variant)}.fst").is_file() for name in names):
+                selected, size = tuple(sorted(variant)), os.path.getsize(str(path))
+        SELECTED_CLASSES[key] = selected
+    return SELECTED_CLASSES[key]
@@ -0,0 +1,81 @@
+# Copyright (c) 2025 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from importlib.resources import files
+from typing import Dict, Literal, Optional
+
+# The tables cover the numbers below FAST_PATH_RANGE: their digits for TN, their TN outputs for ITN.
+FAST_PATH_RANGE = 10000
+TABLES = {}
+LOCK = threading.Lock()
+
+
+def table_name(lang: Literal["zh", "ja"], operator: Literal["tn", "itn"], enable_0_to_9: bool = False) -> str:
+    """
+    Get the name of the fast path table, e.g. "zh/itn/fast_path_enable_0_to_9".
+
+    Args:
+        lang: The language of the text.
+        operator: The operator to use.
+        enable_0_to_9: Whether to enable 0-to-9 conversion for ITN.
+    Returns:
+        The name of the table.
+    """
+    name = f"{lang}/{operator}/fast_path"
+    return name + "_enable_0_to_9" if enable_0_to_9 and operator == "itn" else name
+
+
+def load_table(name: str) -> Dict[str, str]:
+    """
+    Load the fast path table built by build_fsts.py, empty if it is not built.
+
+    Args:
+        name: The name of the table.
+    Returns:
+        The tagged and verbalized text of each input.
+    """
+    table = TABLES.get(name)
+    if table is not None:
+        return table
+    with LOCK:
+        if name not in TABLES:
+            table = {}
+            path = files("wetext.fsts").joinpath(f"{name}.tsv")
+            if path.is_file():
+                for line in path.read_text(encoding="utf-8").splitlines():
+                    key, value = line.split("\t")
+                    table[key] = value
+            TABLES[name] = table
+        return TABLES[name]
+
+
+def lookup(
+    text: str, lang: Literal["en", "zh", "ja"], operator: Literal["tn", "itn"], enable_0_to_9: bool = False
+) -> Optional[str]:
+    """
+    Look up the output of the tagger and verbalizer for simple numeric inputs, e.g. "2024" for
+    TN and "一百二十三" for ITN.
+
+    Args:
+        text: The preprocessed text.
+        lang: The language of the text.
+        operator: The operator to use.
+        enable_0_to_9: Whether to enable 0-to-9 conversion for ITN.
+    Returns:
+        The verbalized text, None if the text is not covered by the fast path.
+    """
+    if lang == "en":
+        return None
+    return load_table(table_name(lang, operator, enable_0_to_9)).get(text)
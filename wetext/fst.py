@@ -0,0 +1,272 @@
+# Copyright (c) 2024 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import struct
+import threading
+import time
+from importlib.resources import files
+from typing import Dict, List, Optional
+
+from kaldifst import TextNormalizer
+
+FST_MAGIC_NUMBER = 2125659606
+
+
+def read_header(fst_path: str) -> Dict:
+    """
+    Read the header of an OpenFst binary file without loading the FST.
+
+    Args:
+        fst_path: The path to the FST file.
+    Returns:
+        The FST type, arc type, number of states and number of arcs.
+    """
+    with open(fst_path, "rb") as fin:
+        (magic,) = struct.unpack("<i", fin.read(4))
+        if magic != FST_MAGIC_NUMBER:
+            raise ValueError(f"{fst_path} is not an OpenFst binary file.")
+        header = {}
+        for key in ("fst_type", "arc_type"):
+            (size,) = struct.unpack("<i", fin.read(4))
+            header[key] = fin.read(size).decode()
+        _, _, _, _, num_states, num_arcs = struct.unpack("<iiQqqq", fin.read(40))
+    header["states"] = num_states
+    header["arcs"] = num_arcs
+    return header
+
+
+class Fst:
+    """A lazily loaded FST, which may be evicted by its registry and is reloaded on the next call."""
+
+    def __init__(self, name: str, registry: "FstRegistry"):
+        self.name = name
+        self.registry = registry
+        # The loaded handles, keyed by thread ident in per-thread mode and by None when shared. The dict is
+        # replaced rather than mutated, so that it can be read without a lock.
+        self.normalizers = {}
+        self.last_used = None
+        # Serializes the loading of this FST, the other FSTs are not blocked while it loads.
+        self.lock = threading.Lock()
+        self._path = None
+        self._header = None
+
+    @property
+    def path(self) -> str:
+        # Resolved on first use, so that importing wetext does not require the fsts package.
+        if self._path is None:
+            self._path = str(files("wetext.fsts").joinpath(f"{self.name}.fst"))
+        return self._path
+
+    @property
+    def header(self) -> Dict:
+        if self._header is None:
+            self._header = read_header(self.path)
+        return self._header
+
+    @property
+    def size(self) -> int:
+        # The resident size of a vector FST is close to its size on disk.
+        return os.path.getsize(self.path)
+
+    @property
+    def memory(self) -> int:
+        return self.size * len(self.normalizers)
+
+    @property
+    def loaded(self) -> bool:
+        return len(self.normalizers) > 0
+
+    def load(self) -> TextNormalizer:
+        return self.registry.acquire(self)
+
+    def unload(self):
+        self.registry.release(self)
+
+    def info(self) -> Dict:
+        return {
+            "name": self.name,
+            "path": self.path,
+            "states": self.header["states"],
+            "arcs": self.header["arcs"],
+            "size": self.size,
+            "memory": self.memory,
+            "handles": len(self.normalizers),
+            "loaded": self.loaded,
+            "last_used": self.last_used,
+        }
+
+    def __call__(self, text: str) -> str:
+        return self.load()(text)
+
+    def __repr__(self):
+        return f"Fst(name={self.name!r}, loaded={self.loaded})"
+
+
+class FstRegistry:
+    """
+    Keeps track of the FSTs in use and evicts the least recently used ones to stay within a memory budget.
+
+    By default every FST has a single handle shared by all threads. In per-thread mode each thread
+    gets its own handle, at the cost of one copy of the FST per thread.
+    """
+
+    def __init__(self, budget: Optional[int] = None, per_thread: bool = False):
+        self.budget = budget
+        self.per_thread = per_thread
+        self.fsts = {}
+        # The loaded FSTs, evicted in the order of their last use.
+        self.resident = {}
+        self.lock = threading.RLock()
+
+    def get(self, name: str) -> Fst:
+        """
+        Get the FST by name (its path relative to the fsts directory, without the extension).
+
+        Args:
+            name: The name of the FST, e.g. "zh/tn/tagger".
+        Returns:
+            The FST handle, which is loaded on first use.
+        """
+        with self.lock:
+            if name not in self.fsts:
+                self.fsts[name] = Fst(name, self)
+            return self.fsts[name]
+
+    @property
+    def memory(self) -> int:
+        with self.lock:
+            return sum(fst.memory for fst in self.resident.values())
+
+    def acquire(self, fst: Fst) -> TextNormalizer:
+        key = threading.get_ident() if self.per_thread else None
+        fst.last_used = time.time()
+        # Fast path without any lock: the handle is already loaded.
+        normalizer = fst.normalizers.get(key)
+        if normalizer is not None:
+            return normalizer
+        with fst.lock:
+            normalizer = fst.normalizers.get(key)
+            if normalizer is not None:
+                return normalizer
+            with self.lock:
+                self.evict(fst.size, exclude=fst)
+            # Load without holding the registry lock, so that the calls to the loaded FSTs go on.
+            normalizer = TextNormalizer(fst.path)
+            with self.lock:
+                normalizers = fst.normalizers
+                if self.per_thread:
+                    # Drop the handles of the threads that have exited.
+                    idents = {thread.ident for thread in threading.enumerate()}
+                    normalizers = {ident: handle for ident, handle in normalizers.items() if ident in idents}
+                fst.normalizers = {**normalizers, key: normalizer}
+                self.resident[fst.name] = fst
+                # The FSTs loaded concurrently may have exceeded the budget in the meantime.
+                self.evict(exclude=fst)
+            return normalizer
+
+    def release(self, fst: Fst):
+        with self.lock:
+            # Callers that already hold a handle keep using it until they return.
+            fst.normalizers = {}
+            self.resident.pop(fst.name, None)
+
+    def evict(self, required: int = 0, exclude: Optional[Fst] = None):
+        """
+        Unload the least recently used FSTs until `required` more bytes fit into the budget.
+
+        Args:
+            required: The number of bytes about to be loaded.
+            exclude: The FST being loaded, which is not evicted.
+        """
+        if self.budget is None:
+            return
+        with self.lock:
+            memory = self.memory
+            for fst in sorted(self.resident.values(), key=lambda fst: fst.last_used or 0):
+                if memory + required <= self.budget:
+                    break
+                if fst is not exclude:
+                    memory -= fst.memory
+                    self.release(fst)
+
+    def set_budget(self, budget: Optional[int]):
+        with self.lock:
+            self.budget = budget
+            self.evict()
+
+    def set_per_thread(self, per_thread: bool):
+        with self.lock:
+            if per_thread != self.per_thread:
+                self.unload()
+                self.per_thread = per_thread
+
+    def unload(self, name: Optional[str] = None):
+        with self.lock:
+            if name is not None and name not in self.fsts:
+                raise KeyError(f"Unknown FST: {name}, the known FSTs are: {', '.join(sorted(self.fsts))}.")
+            fsts = list(self.resident.values()) if name is None else [self.fsts[name]]
+            for fst in fsts:
+                self.release(fst)
+
+    def info(self) -> List[Dict]:
+        with self.lock:
+            return [fst.info() for fst in self.fsts.values() if os.path.exists(fst.path)]
+
+
+REGISTRY = FstRegistry()
+
+
+def fst_info() -> List[Dict]:
+    """
+    Get the inventory of the known FSTs.
+
+    Returns:
+        The name, path, number of states and arcs, approximate size of one handle and resident
+        memory in bytes, number of loaded handles, whether it is loaded and the last use time
+        (seconds since the epoch) of each FST found on disk.
+    """
+    return REGISTRY.info()
+
+
+def set_memory_budget(budget: Optional[int]):
+    """
+    Set the memory budget of the loaded FSTs. The least recently used FSTs are unloaded
+    when the budget is exceeded, and are reloaded transparently on their next use.
+
+    Args:
+        budget: The budget in bytes, None for unlimited.
+    """
+    REGISTRY.set_budget(budget)
+
+
+def set_per_thread(per_thread: bool):
+    """
+    Give each thread its own FST handles instead of sharing them. Only useful when the
+    FST runtime does not serialize concurrent calls, as every thread holds a copy of the FSTs.
+
+    Args:
+        per_thread: Whether to use per-thread handles.
+    """
+    REGISTRY.set_per_thread(per_thread)
+
+
+def unload(name: Optional[str] = None):
+    """
+    Unload the FST, it is reloaded transparently on its next use. Raises KeyError for an unknown FST.
+
+    Args:
+        name: The name of the FST (e.g. "zh/tn/tagger"), None for all the loaded FSTs.
+    """
+    REGISTRY.unload(name)
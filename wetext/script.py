@@ -0,0 +1,85 @@
+# Copyright (c) 2025 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Inclusive code point ranges of the scripts, they may overlap (e.g. erhua is also han).
+SCRIPT_RANGES = {
+    "han": [(0x4E00, 0x9FFF)],
+    "kana": [(0x3040, 0x30FF), (0x31F0, 0x31FF), (0xFF66, 0xFF9F)],
+    "latin": [(0x41, 0x5A), (0x61, 0x7A), (0xC0, 0x24F)],
+    "digit": [(0x30, 0x39), (0xFF10, 0xFF19)],
+    "fullwidth": [(0x3000, 0x3000), (0xFF01, 0xFF5E)],
+    "erhua": [(0x513F, 0x513F), (0x5152, 0x5152)],
+    # The ranges whose decimal digits, if any, are all counted as digit.
+    "known": [(0x0, 0x65F), (0x3000, 0x303F), (0x3040, 0x31FF), (0x4E00, 0x9FFF), (0xFF00, 0xFFEF)],
+}
+# The boundaries of the disjoint intervals [BOUNDS[i - 1], BOUNDS[i]) between the ranges.
+BOUNDS = sorted({bound for ranges in SCRIPT_RANGES.values() for lo, hi in ranges for bound in (lo, hi + 1)})
+# The intervals, indexed by bisect_right(BOUNDS, code point), making up each script.
+INTERVALS = {
+    script: [i for i in range(1, len(BOUNDS)) for lo, hi in ranges if lo <= BOUNDS[i - 1] and BOUNDS[i] <= hi + 1]
+    for script, ranges in SCRIPT_RANGES.items()
+}
+# Below this length, the bisect loop costs no more than the fixed ~12us of the NumPy calls.
+NUMPY_MIN_LENGTH = 16
+
+
+@dataclass(frozen=True)
+class ScriptStats:
+    """Number of code points of each script in a text."""
+
+    total: int = 0
+    han: int = 0
+    kana: int = 0
+    latin: int = 0
+    digit: int = 0
+    """ASCII and full-width decimal digits."""
+    fullwidth: int = 0
+    """Full-width forms of the ASCII characters and the ideographic space."""
+    erhua: int = 0
+    """'儿' and '兒'."""
+    other: int = 0
+    """Code points outside the known ranges, which may be other decimal digits (e.g. Arabic-Indic digits)."""
+
+
+def script_stats(text: str) -> ScriptStats:
+    """
+    Count the code points of each script in one pass, vectorized with NumPy if available.
+
+    The normalizer gates and detects the language with regex scans that stop early, which are faster on average;
+    the histogram is for the callers that need the counts themselves and can pass them on to get_lang() and
+    should_normalize().
+
+    Args:
+        text: The text to count.
+    Returns:
+        The script histogram of the text.
+    """
+    if np is not None and len(text) >= NUMPY_MIN_LENGTH:
+        code_points = np.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+        counts = np.bincount(np.searchsorted(BOUNDS, code_points, side="right"), minlength=len(BOUNDS) + 1).tolist()
+    else:
+        counter = Counter(bisect_right(BOUNDS, ord(char)) for char in text)
+        counts = [counter[i] for i in range(len(BOUNDS) + 1)]
+    histogram = {script: sum(counts[i] for i in intervals) for script, intervals in INTERVALS.items()}
+    histogram["other"] = len(text) - histogram.pop("known")
+    return ScriptStats(total=len(text), **histogram)
@@ -138,3 +138,20 @@ class TokenParser:
         for token in self.tokens:
             output += token.string(self.orders) + " "
         return output.strip()
+
+    def segments(self, input):
+        """
+        Split the tokens into runs of pass-through chars and runs of the other tokens.
+        The values of the chars are joined directly, the other tokens are reordered.
+        """
+        self.parse(input)
+        segments = []
+        for token in self.tokens:
+            # Escaped values are left to the verbalizer.
+            is_char = token.name == "char" and token.order == ["value"] and "\\" not in token.members["value"]
+            text = token.members["value"] if is_char else token.string(self.orders)
+            if len(segments) > 0 and segments[-1][0] == is_char:
+                segments[-1][1].append(text)
+            else:
+                segments.append((is_char, [text]))
+        return [(is_char, ("" if is_char else " ").join(texts)) for is_char, texts in segments]
@@ -14,41 +14,57 @@
 
 import re
 from dataclasses import replace
-from typing import Literal, Optional
-
-import contractions
+from typing import Dict, List, Literal, Optional, Tuple
 
+from wetext import fast_path
 from wetext.config import NormalizerConfig
-from wetext.constants import FSTS
+from wetext.constants import FSTS, check_classes, load_fst, select_classes, variant_name
+from wetext.script import ScriptStats
 from wetext.token_parser import TokenParser
 
+DIGIT = re.compile(r"\d")
+ERHUA = re.compile(r"儿|兒")
+KANA = re.compile(r"[\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f]")
+KANA_OR_HAN = re.compile(r"[\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f\u4e00-\u9fff]")
+
 
-def get_lang(text: str) -> Literal["en", "zh", "ja"]:
+def get_lang(text: str, stats: Optional[ScriptStats] = None) -> Literal["en", "zh", "ja"]:
     """
     Get the language of the text.
 
     Args:
         text: The text to get the language of.
+        stats: Optional script histogram of the text, used instead of scanning it again.
     Returns:
         The language of the text.
     """
-    contains_chinese = False
-    for ch in text:
-        if "\u4e00" <= ch <= "\u9fff":
-            contains_chinese = True
-    return "zh" if contains_chinese or text.isdigit() else "en"
+    if stats is not None:
+        if stats.kana > 0:
+            return "ja"
+        only_digits = stats.digit == stats.total > 0 or (stats.other > 0 and text.isdigit())
+        return "zh" if stats.han > 0 or only_digits else "en"
+    match = KANA_OR_HAN.search(text)
+    if match is None:
+        return "zh" if text.isdigit() else "en"
+    # Stop at the first Kana, otherwise look for one after the first Han.
+    if not "\u4e00" <= match.group() <= "\u9fff" or KANA.search(text, match.end()):
+        return "ja"
+    return "zh"
 
 
-def preprocess(text: str, traditional_to_simple: bool = False) -> str:
+def preprocess(text: str, traditional_to_simple: bool = False, fix_contractions: bool = False) -> str:
     """
     Preprocess the text before normalization.
 
     Args:
         text: The text to preprocess.
         traditional_to_simple: Whether to convert traditional Chinese to simplified Chinese.
+        fix_contractions: Whether to expand English contractions.
     Returns:
         The preprocessed text.
     """
+    if fix_contractions and "'" in text:
+        text = FSTS["preprocess"]["fix_contractions"](text)
     if traditional_to_simple:
         text = FSTS["preprocess"]["traditional_to_simple"](text)
     return text.strip()
@@ -84,7 +100,9 @@ def postprocess(
     return text.strip()
 
 
-def should_normalize(text: str, operator: Literal["tn", "itn"], remove_erhua: bool = False) -> bool:
+def should_normalize(
+    text: str, operator: Literal["tn", "itn"], remove_erhua: bool = False, stats: Optional[ScriptStats] = None
+) -> bool:
     """
     Check if the text should be normalized.
 
@@ -92,13 +110,16 @@ def should_normalize(text: str, operator: Literal["tn", "itn"], remove_erhua: bo
         text: The text to check.
         operator: The operator to use.
         remove_erhua: Whether to remove erhua for TN.
+        stats: Optional script histogram of the text, used instead of scanning it again.
     Returns:
         True if the text should be normalized, False otherwise.
     """
     if operator == "tn":
-        if bool(re.search(r"\d", text)):
+        if stats is None:
+            return bool(DIGIT.search(text) or (remove_erhua and ERHUA.search(text)))
+        if stats.digit > 0 or (stats.other > 0 and DIGIT.search(text)):
             return True
-        if remove_erhua and re.search(r"儿|兒", text):
+        if remove_erhua and stats.erhua > 0:
             return True
         return False
     return len(text) > 0
@@ -117,7 +138,13 @@ def reorder(text: str, lang: Literal["en", "zh", "ja"], operator: Literal["tn",
     return TokenParser(lang, operator).reorder(text)
 
 
-def tag(text: str, lang: Literal["en", "zh", "ja"], operator: Literal["tn", "itn"], enable_0_to_9: bool = False) -> str:
+def tag(
+    text: str,
+    lang: Literal["en", "zh", "ja"],
+    operator: Literal["tn", "itn"],
+    enable_0_to_9: bool = False,
+    classes: Optional[Tuple[str, ...]] = None,
+) -> str:
     """
     Tag the text.
 
@@ -126,17 +153,49 @@ def tag(text: str, lang: Literal["en", "zh", "ja"], operator: Literal["tn", "itn
         lang: The language of the text.
         operator: The operator to use.
         enable_0_to_9: Whether to enable 0-to-9 conversion for ITN.
+        classes: The classes of a prebuilt class-selective tagger, None for the full tagger.
     Returns:
         The tagged text.
     """
     tagger = FSTS[lang][operator]["tagger"]
     if enable_0_to_9 and lang != "en" and operator == "itn":
         tagger = FSTS[lang]["itn"]["tagger_enable_0_to_9"]
+    if classes is not None:
+        tagger = load_fst(variant_name(tagger.name, classes))
     return tagger(text).strip()
 
 
+def get_verbalizer(
+    lang: Literal["en", "zh", "ja"],
+    operator: Literal["tn", "itn"],
+    remove_erhua: bool = False,
+    classes: Optional[Tuple[str, ...]] = None,
+):
+    """
+    Get the verbalizer FST.
+
+    Args:
+        lang: The language of the text.
+        operator: The operator to use.
+        remove_erhua: Whether to remove erhua for TN.
+        classes: The classes of a prebuilt class-selective verbalizer, None for the full verbalizer.
+    Returns:
+        The verbalizer FST.
+    """
+    verbalizer = FSTS[lang][operator]["verbalizer"]
+    if remove_erhua and lang == "zh" and operator == "tn":
+        verbalizer = FSTS["zh"]["tn"]["verbalizer_remove_erhua"]
+    if classes is not None:
+        verbalizer = load_fst(variant_name(verbalizer.name, classes))
+    return verbalizer
+
+
 def verbalize(
-    text: str, lang: Literal["en", "zh", "ja"], operator: Literal["tn", "itn"], remove_erhua: bool = False
+    text: str,
+    lang: Literal["en", "zh", "ja"],
+    operator: Literal["tn", "itn"],
+    remove_erhua: bool = False,
+    classes: Optional[Tuple[str, ...]] = None,
 ) -> str:
     """
     Verbalize the text.
@@ -146,13 +205,90 @@ def verbalize(
         lang: The language of the text.
         operator: The operator to use.
         remove_erhua: Whether to remove erhua for TN.
+        classes: The classes of a prebuilt class-selective verbalizer, None for the full verbalizer.
     Returns:
         The verbalized text.
     """
-    verbalizer = FSTS[lang][operator]["verbalizer"]
-    if remove_erhua and lang == "zh" and operator == "tn":
-        verbalizer = FSTS["zh"]["tn"]["verbalizer_remove_erhua"]
-    return verbalizer(text).strip()
+    return get_verbalizer(lang, operator, remove_erhua, classes)(text).strip()
+
+
+def reorder_and_verbalize(
+    text: str,
+    lang: Literal["en", "zh", "ja"],
+    operator: Literal["tn", "itn"],
+    remove_erhua: bool = False,
+    classes: Optional[Tuple[str, ...]] = None,
+) -> str:
+    """
+    Reorder and verbalize the tagged text. For Chinese and Japanese, the runs of pass-through
+    char tokens are copied directly and only the other tokens go through the verbalizer.
+
+    Args:
+        text: The tagged text.
+        lang: The language of the text.
+        operator: The operator to use.
+        remove_erhua: Whether to remove erhua for TN.
+        classes: The classes of a prebuilt class-selective verbalizer, None for the full verbalizer.
+    Returns:
+        The verbalized text.
+    """
+    if lang == "en":
+        return verbalize(reorder(text, lang, operator), lang, operator, remove_erhua, classes)
+    verbalizer = get_verbalizer(lang, operator, remove_erhua, classes)
+    output = ""
+    for is_char, segment in TokenParser(lang, operator).segments(text):
+        output += segment if is_char else verbalizer(segment)
+    return output.strip()
+
+
+def run_stages(text: str, config: NormalizerConfig, cache: Optional[Dict] = None) -> str:
+    """
+    Run the normalization stages on the text.
+
+    Args:
+        text: The text to normalize.
+        config: The normalization config.
+        cache: Optional stage outputs keyed by the stage and its arguments, shared between configs.
+    Returns:
+        The normalized text.
+    """
+
+    def run(stage, *args):
+        if cache is None:
+            return stage(*args)
+        key = (stage.__name__, *args)
+        if key not in cache:
+            cache[key] = stage(*args)
+        return cache[key]
+
+    operator = config.operator
+    if config.classes is not None:
+        # Checked before the language detection, so that unknown classes fail on any text.
+        check_classes(operator, config.classes)
+    text = run(preprocess, text, config.traditional_to_simple, config.fix_contractions)
+    if run(should_normalize, text, operator, config.remove_erhua and operator == "tn"):
+        lang = config.lang
+        if lang == "auto":
+            lang = run(get_lang, text)
+        if lang == "en" and operator == "itn":
+            # ITN for English is not supported now, using ITN for Chinese instead.
+            lang = "zh"
+        # Only pass the flags that change the FST in use, so that more configs share the stage.
+        enable_0_to_9 = config.enable_0_to_9 and lang != "en" and operator == "itn"
+        remove_erhua = config.remove_erhua and lang == "zh" and operator == "tn"
+        classes = None
+        if config.classes is not None:
+            classes = select_classes(lang, operator, config.classes, enable_0_to_9, remove_erhua)
+        verbalized = None
+        if not remove_erhua and classes is None:
+            verbalized = fast_path.lookup(text, lang, operator, enable_0_to_9)
+        if verbalized is None:
+            text = run(tag, text, lang, operator, enable_0_to_9, classes)
+            verbalized = run(reorder_and_verbalize, text, lang, operator, remove_erhua, classes)
+        text = verbalized
+    return run(
+        postprocess, text, config.full_to_half, config.remove_interjections, config.remove_puncts, config.tag_oov
+    )
 
 
 def normalize(text: str, config: Optional[NormalizerConfig] = None, **kwargs):
@@ -166,19 +302,57 @@ def normalize(text: str, config: Optional[NormalizerConfig] = None, **kwargs):
         The normalized text.
     """
     config = replace(config or NormalizerConfig(), **kwargs)
+    return run_stages(text, config)
 
-    if config.fix_contractions and "'" in text:
-        text = contractions.fix(text)
-    text = preprocess(text, config.traditional_to_simple)
-    lang = config.lang
-    if should_normalize(text, config.operator, config.remove_erhua):
-        if lang == "auto":
-            lang = get_lang(text)
-        if lang == "en" and config.operator == "itn":
-            # ITN for English is not supported now, using ITN for Chinese instead.
-            lang = "zh"
-        text = tag(text, lang, config.operator, config.enable_0_to_9)
-        text = reorder(text, lang, config.operator)
-        text = verbalize(text, lang, config.operator, config.remove_erhua)
-    text = postprocess(text, config.full_to_half, config.remove_interjections, config.remove_puncts, config.tag_oov)
-    return text
+
+def normalize_bytes(data: bytes, config: Optional[NormalizerConfig] = None, **kwargs) -> bytes:
+    """
+    Normalize the UTF-8 encoded text. This is a convenience wrapper, which decodes the text, normalizes it
+    and encodes the output, as the FSTs only take Python strings.
+
+    Args:
+        data: The UTF-8 encoded text, any bytes-like object.
+        config: Optional normalization config object.
+    Returns:
+        The UTF-8 encoded normalized text.
+    """
+    config = replace(config or NormalizerConfig(), **kwargs)
+    return run_stages(str(data, "utf-8"), config).encode("utf-8")
+
+
+def normalize_lines(buffer: bytes, config: Optional[NormalizerConfig] = None, **kwargs) -> bytes:
+    """
+    Normalize a buffer of newline-delimited UTF-8 records. The buffer is decoded and the output
+    is encoded once, the empty records are kept and the duplicate records are normalized once.
+    The line terminators ("\n" or "\r\n") are kept.
+
+    Args:
+        buffer: The UTF-8 encoded records, any bytes-like object.
+        config: Optional normalization config object.
+    Returns:
+        The UTF-8 encoded normalized records, with the line terminators of the input.
+    """
+    config = replace(config or NormalizerConfig(), **kwargs)
+    outputs = {"": ""}
+    lines = []
+    for line in str(buffer, "utf-8").split("\n"):
+        record, terminator = (line[:-1], "\r") if line.endswith("\r") else (line, "")
+        if record not in outputs:
+            outputs[record] = run_stages(record, config)
+        lines.append(outputs[record] + terminator)
+    return "\n".join(lines).encode("utf-8")
+
+
+def normalize_multi(text: str, configs: List[NormalizerConfig]) -> List[str]:
+    """
+    Normalize the text with several configs. The stages with the same input and arguments
+    (e.g. preprocessing and tagging) run once and are shared by the configs.
+
+    Args:
+        text: The text to normalize.
+        configs: The normalization configs.
+    Returns:
+        The normalized text of each config.
+    """
+    cache = {}
+    return [run_stages(text, config, cache) for config in configs]
@@ -13,9 +13,11 @@
 # limitations under the License.
 
 from dataclasses import asdict, replace
+from typing import Dict, List, Optional, Union
 
+from wetext.column import normalize_column
 from wetext.config import NormalizerConfig
-from wetext.utils import normalize
+from wetext.utils import normalize, normalize_bytes, normalize_lines, normalize_multi
 
 
 class Normalizer:
@@ -32,3 +34,50 @@ class Normalizer:
         """
         config = replace(self.config, **kwargs)
         return normalize(text, **asdict(config))
+
+    def normalize_bytes(self, data: bytes, **kwargs) -> bytes:
+        """
+        Normalize the UTF-8 encoded text, a convenience wrapper decoding the text and encoding the output.
+
+        Args:
+            data: The UTF-8 encoded text.
+            **kwargs: The keyword arguments to override the config.
+        """
+        config = replace(self.config, **kwargs)
+        return normalize_bytes(data, config)
+
+    def normalize_lines(self, buffer: bytes, **kwargs) -> bytes:
+        """
+        Normalize a buffer of newline-delimited UTF-8 records, keeping the line terminators.
+
+        Args:
+            buffer: The UTF-8 encoded records.
+            **kwargs: The keyword arguments to override the config.
+        """
+        config = replace(self.config, **kwargs)
+        return normalize_lines(buffer, config)
+
+    def normalize_multi(self, text: str, configs: List[Union[Dict, NormalizerConfig]]) -> List[str]:
+        """
+        Normalize the text with several configs, sharing the common stages.
+
+        Args:
+            text: The text to normalize.
+            configs: The configs, or the keyword arguments to override the config.
+        """
+        configs = [
+            config if isinstance(config, NormalizerConfig) else replace(self.config, **config) for config in configs
+        ]
+        return normalize_multi(text, configs)
+
+    def normalize_column(self, column, num_workers: Optional[int] = None, **kwargs):
+        """
+        Normalize a pyarrow string array or a pandas Series, each distinct value once.
+
+        Args:
+            column: The column to normalize.
+            num_workers: The number of threads normalizing the distinct values in parallel.
+            **kwargs: The keyword arguments to override the config.
+        """
+        config = replace(self.config, **kwargs)
+        return normalize_column(column, config, num_workers)